@@ -67,7 +67,7 @@ def archive_files():
             print(f"  Error moving {png_file}: {e}")
     
     # Archive HTML files
-    html_files = glob.glob("*.html") + glob.glob("chartify/*.html")
+    html_files = glob.glob("*.html") + glob.glob("chartify/*.html") + glob.glob("stock_charts_index.js*")
     html_count = 0
     
     if html_files:
@@ -7,10 +7,28 @@ import os
 import glob
 import shutil
 from datetime import datetime
+from ohlcv_pyramid import refresh_pyramid, select_resolution, LEVEL_LABELS
+from memory_budget import get_memory_budget_mb
 
-def load_csv_data(csv_file):
-    """Load and ETL CSV data to match yfinance format"""
-    df = pd.read_csv(csv_file)
+PYRAMID_DIR = "stock_data/pyramid"
+
+def load_csv_data(csv_file, downcast=False):
+    """Load and ETL CSV data to match yfinance format
+    
+    With downcast=True prices are kept as float32 and volume as the smallest
+    integer type, which roughly halves the memory of each frame.
+    """
+    # mplfinance expects: Open, High, Low, Close, Volume
+    required_columns = ['Open', 'High', 'Low', 'Close', 'Volume']
+    
+    # Check if all required columns exist before reading the data
+    header = pd.read_csv(csv_file, nrows=0).columns
+    for col in required_columns:
+        if col not in header:
+            raise ValueError(f"Required column '{col}' not found in CSV")
+    
+    # Only read the columns we need so no trimmed copy has to be made later
+    df = pd.read_csv(csv_file, usecols=['Date'] + required_columns)
     
     # Convert Date column to datetime and set as index
     df['Date'] = pd.to_datetime(df['Date'], utc=True)
@@ -20,26 +38,18 @@ def load_csv_data(csv_file):
     if not isinstance(df.index, pd.DatetimeIndex):
         df.index = pd.DatetimeIndex(df.index)
     
-    # Ensure columns are in the right order and format for mplfinance
-    # mplfinance expects: Open, High, Low, Close, Volume
-    required_columns = ['Open', 'High', 'Low', 'Close', 'Volume']
-    
-    # Check if all required columns exist
-    for col in required_columns:
-        if col not in df.columns:
-            raise ValueError(f"Required column '{col}' not found in CSV")
-    
-    # Select only the required columns
-    df_clean = df[required_columns].copy()
-    
-    # Convert to float (in case they're strings)
+    # Convert to float (in case they're strings), column by column in place
     for col in required_columns:
-        df_clean[col] = pd.to_numeric(df_clean[col], errors='coerce')
+        compact = 'float' if downcast and col != 'Volume' else None
+        df[col] = pd.to_numeric(df[col], errors='coerce', downcast=compact)
     
     # Remove any rows with NaN values
-    df_clean = df_clean.dropna()
+    df.dropna(inplace=True)
     
-    return df_clean
+    if downcast:
+        df['Volume'] = pd.to_numeric(df['Volume'], downcast='integer')
+    
+    return df
 
 def create_volume_colors(data):
     """Create green/red colors for volume bars based on price movement"""
@@ -66,7 +76,7 @@ def calculate_bollinger_band_width(data, window=7, num_std=2):
     
     return bb_width
 
-def plot_candlestick_chart(data, symbol, bb_period=7):
+def plot_candlestick_chart(data, symbol, bb_period=7, resolution='daily'):
     """Create candlestick chart with colored volume bars and Bollinger Band Width"""
     volume_colors = create_volume_colors(data)
     
@@ -93,7 +103,7 @@ def plot_candlestick_chart(data, symbol, bb_period=7):
         volume=True,
         style=style,
         addplot=apds,
-        title=f'{symbol} - Candlestick Chart with Volume and {bb_period}-Period BB Width',
+        title=f'{symbol} - {LEVEL_LABELS[resolution]} Candlestick Chart with Volume and {bb_period}-Period BB Width',
         ylabel='Price ($)',
         ylabel_lower='Volume',
         volume_panel=1,
@@ -105,6 +115,53 @@ def plot_candlestick_chart(data, symbol, bb_period=7):
         savefig=f'stock_png/{symbol}.png'
     )
 
+def render_chart(data, chart_name, days, bb_period):
+    """Refresh the resolution pyramid for one symbol and save its chart"""
+    # Keep weekly/monthly aggregates up to date and pick the coarsest
+    # resolution that still gives enough candles for the last N days
+    symbol = chart_name.split('_')[0]
+    pyramid = refresh_pyramid(data, PYRAMID_DIR, symbol)
+    resolution, data = select_resolution(pyramid, days)
+    
+    print(f"Data loaded successfully. {len(data)} {resolution} candles. Creating chart...")
+    plot_candlestick_chart(data, chart_name, bb_period, resolution)
+    print(f"Chart saved as stock_png/{chart_name}.png")
+
+_worker_universe = None
+
+def _attach_worker(shm_name):
+    """Pool initializer: attach to the shared universe once per worker"""
+    global _worker_universe
+    from universe_dataset import attach_universe
+    _worker_universe = attach_universe(name=shm_name)
+
+def _render_shared(args):
+    chart_name, days, bb_period = args
+    try:
+        render_chart(_worker_universe.frame(chart_name), chart_name, days, bb_period)
+    except Exception as e:
+        print(f"Error processing {chart_name}: {e}")
+
+def render_charts_parallel(csv_files, days, bb_period, workers):
+    """Render charts in a process pool sharing one copy of the price data
+    
+    The CSV files are parsed once into a shared memory block; each worker
+    only attaches to it instead of loading its own copy of the frames.
+    """
+    from multiprocessing import Pool
+    from universe_dataset import create_shared_universe
+    
+    shm, index = create_shared_universe(csv_files)
+    try:
+        tasks = [(chart_name, days, bb_period) for chart_name in index]
+        
+        print(f"Rendering {len(tasks)} charts with {workers} workers")
+        with Pool(workers, initializer=_attach_worker, initargs=(shm.name,)) as pool:
+            pool.map(_render_shared, tasks)
+    finally:
+        shm.close()
+        shm.unlink()
+
 def main():
     """Main function to run the candlestick chart application"""
     # Get settings from days.txt
@@ -113,11 +170,13 @@ def main():
             lines = f.read().strip().split('\n')
             days = int(lines[0])
             bb_period = int(lines[1]) if len(lines) > 1 else 7
-        print(f"Reading {days} days and {bb_period} BB period from days.txt")
+            workers = int(lines[2]) if len(lines) > 2 else 1
+        print(f"Reading {days} days, {bb_period} BB period and {workers} workers from days.txt")
     except (FileNotFoundError, ValueError, IndexError):
         days = 90
         bb_period = 7
-        print(f"Could not read days.txt, using defaults: {days} days, {bb_period} BB period")
+        workers = 1
+        print(f"Could not read days.txt, using defaults: {days} days, {bb_period} BB period, {workers} worker")
     
     # Create directories if they don't exist
     os.makedirs("stock_png", exist_ok=True)
@@ -131,25 +190,31 @@ def main():
     
     print(f"Found {len(csv_files)} CSV files to process")
     
+    # In memory-bounded mode keep compact dtypes and render one file at a
+    # time instead of packing the whole universe for a worker pool
+    downcast = get_memory_budget_mb() is not None
+    if downcast and workers > 1:
+        print("Memory budget set, rendering sequentially")
+        workers = 1
+    
+    if workers > 1:
+        render_charts_parallel(csv_files, days, bb_period, workers)
+        print(f"\nCompleted processing all CSV files.")
+        return
+    
     for csv_file in csv_files:
         try:
             # Extract filename without extension for chart naming
             chart_name = os.path.basename(csv_file).rsplit('.', 1)[0]
             
             print(f"\nProcessing {csv_file}...")
-            data = load_csv_data(csv_file)
-            
-            # Filter to last N days if specified
-            if days and days < len(data):
-                data = data.tail(days)
+            data = load_csv_data(csv_file, downcast=downcast)
             
             if data.empty:
                 print(f"No data found in {csv_file}")
                 continue
             
-            print(f"Data loaded successfully. {len(data)} days of data. Creating chart...")
-            plot_candlestick_chart(data, chart_name, bb_period)
-            print(f"Chart saved as stock_png/{chart_name}.png")
+            render_chart(data, chart_name, days, bb_period)
             
         except Exception as e:
             print(f"Error processing {csv_file}: {e}")
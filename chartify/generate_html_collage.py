@@ -1,110 +1,376 @@
 import os
 import glob
+import json
+import math
+import pandas as pd
 from datetime import datetime
 
-def generate_html_collage():
-    """Generate HTML collage of all stock charts"""
-    
-    # Find all PNG files in stock_png directory (excluding archive)
-    png_files = [f for f in glob.glob("stock_png/*.png") if not f.startswith("stock_png/archive")]
-    
-    if not png_files:
-        print("No PNG files found in stock_png/ directory")
-        return
-    
-    print(f"Found {len(png_files)} PNG files to include in collage")
-    
-    # Sort files for consistent ordering
-    png_files.sort()
-    
-    # Generate HTML content
-    html_content = f"""<!DOCTYPE html>
+INDEX_FILE = "stock_charts_index.json"
+INDEX_SCRIPT_FILE = "stock_charts_index.js"
+OUTPUT_FILE = "stock_charts_collage.html"
+
+def finite_or_none(value):
+    """Return value as a float, or None if it is missing, NaN or infinite
+
+    NaN and Infinity are not valid JSON and make the browser reject the index.
+    """
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+def load_volume_stats():
+    """Load volume rank, volume and change % per symbol from the latest top volume CSV"""
+    csv_files = sorted(glob.glob("stock_data/top_volume_stocks_*.csv"))
+    if not csv_files:
+        return {}
+
+    try:
+        df = pd.read_csv(csv_files[-1])
+    except Exception as e:
+        print(f"Error reading {csv_files[-1]}: {e}")
+        return {}
+
+    # The CSV is saved sorted by volume, so row order is the volume rank
+    stats = {}
+    for rank, row in enumerate(df.to_dict('records'), 1):
+        change = finite_or_none(row['Change_%'])
+        stats[row['Symbol']] = {
+            'volume_rank': rank,
+            'volume': finite_or_none(row['Volume']),
+            'change': None if change is None else round(change, 2),
+        }
+    return stats
+
+def load_screener_stats():
+    """Load squeeze, volume spike and return ranks per chart from the latest screener CSV"""
+    csv_files = sorted(glob.glob("stock_data/screener_results_*.csv"))
+    if not csv_files:
+        return {}
+
+    try:
+        df = pd.read_csv(csv_files[-1])
+    except Exception as e:
+        print(f"Error reading {csv_files[-1]}: {e}")
+        return {}
+
+    stats = {}
+    for row in df.to_dict('records'):
+        stats[row['Chart']] = {
+            'squeeze_rank': None if pd.isna(row['Squeeze_Rank']) else int(row['Squeeze_Rank']),
+            'volume_spike_rank': None if pd.isna(row['Volume_Spike_Rank']) else int(row['Volume_Spike_Rank']),
+            'return_rank': None if pd.isna(row['Return_Rank']) else int(row['Return_Rank']),
+        }
+    return stats
+
+def write_chart_index(png_files, output_file=INDEX_FILE, script_file=INDEX_SCRIPT_FILE):
+    """Write the small JSON index the collage page sorts and filters on
+
+    Entries are written one per line so memory use does not depend on the
+    number of charts. The same index is also written as a script that sets
+    window.STOCK_CHARTS_INDEX, which the page loads when it is opened from
+    disk and the browser refuses to fetch the JSON file.
+    """
+    stats = load_volume_stats()
+    screens = load_screener_stats()
+
+    with open(output_file, 'w', encoding='utf-8') as f, open(script_file, 'w', encoding='utf-8') as js:
+        f.write('[\n')
+        js.write('window.STOCK_CHARTS_INDEX = [\n')
+        for i, png_file in enumerate(png_files):
+            chart_name = os.path.basename(png_file).rsplit('.', 1)[0]
+            symbol = chart_name.split('_')[0]
+            entry = {
+                'symbol': symbol,
+                'name': chart_name,
+                'src': png_file.replace(os.sep, '/'),
+                'volume_rank': None,
+                'volume': None,
+                'change': None,
+                'squeeze_rank': None,
+                'volume_spike_rank': None,
+                'return_rank': None,
+            }
+            entry.update(stats.get(symbol, {}))
+            entry.update(screens.get(chart_name, {}))
+            line = ('' if i == 0 else ',\n') + json.dumps(entry, allow_nan=False)
+            f.write(line)
+            js.write(line)
+        f.write('\n]\n')
+        js.write('\n];\n')
+
+    return output_file
+
+HTML_HEAD = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0, user-scalable=yes, maximum-scale=5.0, minimum-scale=0.5">
     <title>Stock Charts Collage</title>
     <style>
-        body {{
+        body {
             margin: 0;
             padding: 20px;
             font-family: Arial, sans-serif;
             background-color: #f5f5f5;
-        }}
-        .header {{
+        }
+        .header {
             text-align: center;
             margin-bottom: 30px;
-        }}
-        .charts-grid {{
+        }
+        .controls {
+            text-align: center;
+            margin-bottom: 20px;
+        }
+        .controls input, .controls select {
+            font-size: 14px;
+            padding: 4px 8px;
+            margin: 0 4px;
+        }
+        .controls input[type="number"] {
+            width: 130px;
+        }
+        .charts-grid {
             display: grid;
-            grid-template-columns: repeat(10, 1fr);
+            grid-template-columns: repeat(auto-fill, minmax(160px, 1fr));
             gap: 10px;
             margin: 0 auto;
-        }}
-        .chart-container {{
+        }
+        .chart-container {
             background: white;
             border-radius: 4px;
             padding: 8px;
             box-shadow: 0 1px 4px rgba(0,0,0,0.1);
             text-align: center;
-        }}
-        .chart-title {{
+        }
+        .chart-title {
             font-size: 10px;
             font-weight: bold;
             margin-bottom: 5px;
             color: #333;
-        }}
-        .chart-image {{
+        }
+        .chart-image {
             max-width: 100%;
             height: auto;
+            aspect-ratio: 6 / 5;
             border-radius: 4px;
-        }}
-        .stats {{
+        }
+        .stats {
             text-align: center;
             margin-bottom: 20px;
             color: #666;
-        }}
+        }
+        #sentinel {
+            height: 1px;
+        }
     </style>
 </head>
 <body>
-    <div class="header">
+"""
+
+HTML_SCRIPT = """    <script>
+    (function () {
+        var PAGE_SIZE = __PAGE_SIZE__;
+        var charts = [];
+        var view = [];
+        var shown = 0;
+        var grid = document.getElementById('grid');
+        var count = document.getElementById('count');
+        var search = document.getElementById('search');
+        var sortBy = document.getElementById('sort');
+        var maxVolumeRank = document.getElementById('max-volume-rank');
+        var minChange = document.getElementById('min-change');
+        var maxChange = document.getElementById('max-change');
+        var sentinel = document.getElementById('sentinel');
+
+        function compare(key, descending) {
+            return function (a, b) {
+                var x = a[key], y = b[key];
+                if (x === null && y === null) return 0;
+                if (x === null) return 1;
+                if (y === null) return -1;
+                if (x < y) return descending ? 1 : -1;
+                if (x > y) return descending ? -1 : 1;
+                return 0;
+            };
+        }
+
+        function card(chart) {
+            var div = document.createElement('div');
+            div.className = 'chart-container';
+            var title = document.createElement('div');
+            title.className = 'chart-title';
+            title.textContent = chart.name;
+            var img = document.createElement('img');
+            img.className = 'chart-image';
+            img.loading = 'lazy';
+            img.decoding = 'async';
+            img.alt = chart.name;
+            img.src = chart.src;
+            div.appendChild(title);
+            div.appendChild(img);
+            return div;
+        }
+
+        function prefetch(start) {
+            view.slice(start, start + PAGE_SIZE).forEach(function (chart) {
+                new Image().src = chart.src;
+            });
+        }
+
+        function renderPage() {
+            var fragment = document.createDocumentFragment();
+            view.slice(shown, shown + PAGE_SIZE).forEach(function (chart) {
+                fragment.appendChild(card(chart));
+            });
+            grid.appendChild(fragment);
+            shown = Math.min(shown + PAGE_SIZE, view.length);
+            count.textContent = 'Showing ' + shown + ' of ' + view.length + ' charts';
+
+            // Re-observing fires the callbacks again if the sentinel is
+            // still in range, e.g. when one page does not fill the screen.
+            observers.forEach(function (observer) {
+                observer.unobserve(sentinel);
+                observer.observe(sentinel);
+            });
+        }
+
+        // Empty inputs do not filter; charts without a value for a filtered
+        // field are left out
+        function number(input) {
+            return input.value === '' ? null : Number(input.value);
+        }
+
+        function inRange(value, min, max) {
+            if (min === null && max === null) return true;
+            if (value === null) return false;
+            return (min === null || value >= min) && (max === null || value <= max);
+        }
+
+        function update() {
+            var query = search.value.trim().toUpperCase();
+            var parts = sortBy.value.split(':');
+            var topVolume = number(maxVolumeRank);
+            var changeMin = number(minChange);
+            var changeMax = number(maxChange);
+            view = charts.filter(function (chart) {
+                return (!query || chart.symbol.indexOf(query) !== -1) &&
+                    inRange(chart.volume_rank, null, topVolume) &&
+                    inRange(chart.change, changeMin, changeMax);
+            });
+            view.sort(compare(parts[0], parts[1] === 'desc'));
+            grid.innerHTML = '';
+            shown = 0;
+            renderPage();
+        }
+
+        // Append the next page once the user scrolls near the end of the
+        // grid, and warm the cache for the page after it a bit earlier.
+        var observers = [
+            new IntersectionObserver(function (entries) {
+                if (entries[0].isIntersecting && shown < view.length) renderPage();
+            }, { rootMargin: '600px' }),
+            new IntersectionObserver(function (entries) {
+                if (entries[0].isIntersecting) prefetch(shown);
+            }, { rootMargin: '1800px' })
+        ];
+
+        [search, maxVolumeRank, minChange, maxChange].forEach(function (input) {
+            input.addEventListener('input', update);
+        });
+        sortBy.addEventListener('change', update);
+
+        function load(data) {
+            charts = data;
+            update();
+        }
+
+        // Browsers block fetch() for pages opened from disk (file://), so
+        // fall back to the script copy of the index, which loads either way
+        function loadScriptIndex(error) {
+            var script = document.createElement('script');
+            script.src = '__INDEX_SCRIPT_FILE__';
+            script.onload = function () { load(window.STOCK_CHARTS_INDEX); };
+            script.onerror = function () { count.textContent = 'Could not load chart index: ' + error; };
+            document.body.appendChild(script);
+        }
+
+        fetch('__INDEX_FILE__')
+            .then(function (response) { return response.json(); })
+            .then(load)
+            .catch(loadScriptIndex);
+    })();
+    </script>
+"""
+
+def generate_html_collage(page_size=60):
+    """Generate a paginated, lazily loaded HTML collage of all stock charts
+
+    The page itself does not grow with the number of charts: chart metadata
+    goes into a small JSON index and the browser renders one page of images
+    at a time as the user scrolls.
+    """
+
+    # Find all PNG files in stock_png directory (excluding archive)
+    png_files = [f for f in glob.glob("stock_png/*.png") if not f.startswith("stock_png/archive")]
+
+    if not png_files:
+        print("No PNG files found in stock_png/ directory")
+        return
+
+    print(f"Found {len(png_files)} PNG files to include in collage")
+
+    # Sort files for consistent ordering
+    png_files.sort()
+
+    index_file = write_chart_index(png_files)
+    print(f"Chart index written: {index_file} and {INDEX_SCRIPT_FILE}")
+
+    # Stream the page out section by section
+    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+        f.write(HTML_HEAD)
+        f.write(f"""    <div class="header">
         <h1>Stock Charts Collage</h1>
         <div class="stats">
             Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}<br>
             Total Charts: {len(png_files)}
         </div>
     </div>
-    
-    <div class="charts-grid">
-"""
-    
-    # Add each chart to the grid
-    for png_file in png_files:
-        # Extract filename without path and extension for title
-        chart_name = os.path.basename(png_file).rsplit('.', 1)[0]
-        
-        html_content += f"""        <div class="chart-container">
-            <div class="chart-title">{chart_name}</div>
-            <img src="{png_file}" alt="{chart_name}" class="chart-image">
-        </div>
-"""
-    
-    # Close HTML
-    html_content += """    </div>
-</body>
-</html>"""
-    
-    # Write HTML file
-    output_file = "stock_charts_collage.html"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-    
-    print(f"HTML collage generated: {output_file}")
-    print(f"Open {output_file} in your browser to view the collage")
+
+    <div class="controls">
+        <input id="search" type="search" placeholder="Filter by symbol">
+        <input id="max-volume-rank" type="number" min="1" step="1" placeholder="Top N by volume">
+        <input id="min-change" type="number" step="0.1" placeholder="Min change %">
+        <input id="max-change" type="number" step="0.1" placeholder="Max change %">
+        <select id="sort">
+            <option value="symbol:asc">Symbol</option>
+            <option value="volume_rank:asc">Volume rank</option>
+            <option value="change:desc">Change % (high to low)</option>
+            <option value="change:asc">Change % (low to high)</option>
+            <option value="squeeze_rank:asc">Tightest BB squeeze</option>
+            <option value="volume_spike_rank:asc">Volume spike</option>
+            <option value="return_rank:asc">Return rank</option>
+        </select>
+        <div id="count" class="stats"></div>
+    </div>
+
+    <div id="grid" class="charts-grid"></div>
+    <div id="sentinel"></div>
+
+""")
+        f.write(HTML_SCRIPT.replace('__PAGE_SIZE__', str(page_size))
+                .replace('__INDEX_FILE__', INDEX_FILE)
+                .replace('__INDEX_SCRIPT_FILE__', INDEX_SCRIPT_FILE))
+        f.write("""</body>
+</html>""")
+
+    print(f"HTML collage generated: {OUTPUT_FILE}")
+    print(f"Open {OUTPUT_FILE} directly or serve this folder over HTTP to view the collage")
 
 def main():
     """Main function"""
     generate_html_collage()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
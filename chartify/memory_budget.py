@@ -0,0 +1,51 @@
+"""
+Helpers for the memory-bounded (chunked) pipeline mode.
+
+Setting STOCK_MEMORY_BUDGET_MB turns the mode on: stages process symbols in
+chunks sized to the budget and keep compact dtypes instead of accumulating
+full-precision results in memory. Root scripts import this module as
+chartify.memory_budget, the chartify scripts as memory_budget.
+"""
+
+import os
+import sys
+import pandas as pd
+
+def get_memory_budget_mb():
+    """Return the configured memory budget in MB, or None when unbounded"""
+    value = os.environ.get("STOCK_MEMORY_BUDGET_MB")
+    return int(value) if value else None
+
+def chunk_size_for_budget(bytes_per_item, default, budget_mb=None, fraction=0.25, minimum=1):
+    """Number of items per chunk so one chunk uses at most `fraction` of the budget"""
+    if budget_mb is None:
+        budget_mb = get_memory_budget_mb()
+    if budget_mb is None:
+        return default
+    return max(minimum, int(budget_mb * 1024 * 1024 * fraction // bytes_per_item))
+
+def peak_rss_mb(rusage=None):
+    """Peak resident set size in MB for this process (or a given rusage), None if unknown"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    if rusage is None:
+        rusage = resource.getrusage(resource.RUSAGE_SELF)
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return rusage.ru_maxrss / scale
+
+def report_peak_rss(stage):
+    """Print the peak RSS reached so far, labelled with a stage name"""
+    peak = peak_rss_mb()
+    if peak is not None:
+        print(f"[memory] {stage}: peak RSS {peak:.1f} MB")
+
+def downcast_frame(df):
+    """Shrink numeric columns in place to the smallest dtype that holds them"""
+    for col in df.select_dtypes(include='float').columns:
+        df[col] = pd.to_numeric(df[col], downcast='float')
+    for col in df.select_dtypes(include='integer').columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    return df
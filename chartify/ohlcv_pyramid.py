@@ -0,0 +1,173 @@
+import os
+import numpy as np
+import pandas as pd
+
+# Resolution levels from finest to coarsest. Each coarser level is an
+# aggregate of the daily bars, keyed by pandas period alias.
+LEVELS = {
+    'daily': None,
+    'weekly': 'W-FRI',
+    'monthly': 'M',
+}
+
+LEVEL_LABELS = {
+    'daily': 'Daily',
+    'weekly': 'Weekly',
+    'monthly': 'Monthly',
+}
+
+OHLCV_AGG = {
+    'Open': 'first',
+    'High': 'max',
+    'Low': 'min',
+    'Close': 'last',
+    'Volume': 'sum',
+}
+
+def _periods(index, freq):
+    """Map a DatetimeIndex onto calendar periods (drops timezone first)"""
+    if index.tz is not None:
+        index = index.tz_convert(None)
+    return index.to_period(freq)
+
+def resample_ohlcv(daily, freq):
+    """Aggregate daily OHLCV bars into coarser bars for the given period alias
+
+    Each aggregated bar is labelled with the timestamp of the first trading
+    day in its period, so the result can be plotted by mplfinance directly.
+    """
+    if daily.empty:
+        return daily.copy()
+
+    periods = _periods(daily.index, freq)
+    bars = daily.groupby(periods, sort=True).agg(OHLCV_AGG)
+    first_days = pd.Series(daily.index, index=daily.index).groupby(periods, sort=True).first()
+    bars.index = pd.DatetimeIndex(first_days, name=daily.index.name)
+    return bars[list(OHLCV_AGG)]
+
+def build_pyramid(daily):
+    """Build every resolution level from a frame of daily bars"""
+    daily = daily.sort_index()
+    pyramid = {'daily': daily}
+    for level, freq in LEVELS.items():
+        if freq is not None:
+            pyramid[level] = resample_ohlcv(daily, freq)
+    return pyramid
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+
+def _align_adjustment(cached, fresh):
+    """Rescale cached daily bars to the adjustment basis of the fresh data
+
+    yfinance back-adjusts the whole history after every split or dividend,
+    so cached bars can be on an older basis. The ratio between fresh and
+    cached values on the last overlapping day is applied to every cached
+    bar. Returns the (possibly rescaled) cached frame and whether it changed.
+    """
+    overlap = cached.index.intersection(fresh.index)
+    if overlap.empty:
+        return cached, False
+
+    day = overlap[-1]
+    price_ratio = fresh.at[day, 'Close'] / cached.at[day, 'Close']
+    volume_ratio = fresh.at[day, 'Volume'] / cached.at[day, 'Volume'] if cached.at[day, 'Volume'] else 1.0
+    if np.isclose(price_ratio, 1.0, rtol=1e-6) and np.isclose(volume_ratio, 1.0, rtol=1e-6):
+        return cached, False
+
+    cached = cached.copy()
+    cached[PRICE_COLUMNS] = cached[PRICE_COLUMNS] * price_ratio
+    cached['Volume'] = cached['Volume'] * volume_ratio
+    return cached, True
+
+def update_pyramid(pyramid, new_daily):
+    """Merge freshly loaded daily bars and refresh the affected coarse bars
+
+    Across the overlap the fresh bars always win, since they carry the
+    current split/dividend adjustment. Older cached bars are rescaled to the
+    same basis when the overlapping closes disagree, in which case every
+    coarser level is rebuilt. Otherwise only the periods from the first
+    fresh bar onwards are recomputed from the daily level.
+    """
+    new_daily = new_daily.sort_index()
+    if new_daily.empty:
+        return pyramid
+
+    cached, rescaled = _align_adjustment(pyramid['daily'], new_daily)
+    daily = pd.concat([cached[cached.index < new_daily.index[0]], new_daily])
+    if rescaled:
+        return build_pyramid(daily)
+
+    updated = {'daily': daily}
+    for level, freq in LEVELS.items():
+        if freq is None:
+            continue
+
+        bars = pyramid[level]
+        first_period = _periods(new_daily.index[:1], freq)[0]
+
+        # Keep finished periods, rebuild the rest from the daily bars
+        keep = bars[_periods(bars.index, freq) < first_period]
+        tail = daily[_periods(daily.index, freq) >= first_period]
+        updated[level] = pd.concat([keep, resample_ohlcv(tail, freq)])
+
+    return updated
+
+def select_resolution(pyramid, days, min_candles=40):
+    """Pick the coarsest level that still shows min_candles for the window
+
+    The window is the last `days` daily bars. Returns the level name and the
+    bars of that level covering the window.
+    """
+    daily = pyramid['daily']
+    if days and days < len(daily):
+        start = daily.index[-days]
+    else:
+        start = daily.index[0] if not daily.empty else None
+
+    chosen = 'daily'
+    window = daily.tail(days) if days else daily
+
+    for level, freq in LEVELS.items():
+        if freq is None or start is None:
+            continue
+        bars = pyramid[level]
+        # Include the (possibly partial) period containing the window start
+        start_period = _periods(pd.DatetimeIndex([start]), freq)[0]
+        candidate = bars[_periods(bars.index, freq) >= start_period]
+        if len(candidate) >= min_candles:
+            chosen, window = level, candidate
+
+    return chosen, window
+
+def save_pyramid(pyramid, directory, symbol):
+    """Save every level of a pyramid to <directory>/<symbol>_<level>.csv"""
+    os.makedirs(directory, exist_ok=True)
+    for level, bars in pyramid.items():
+        bars.to_csv(os.path.join(directory, f"{symbol}_{level}.csv"), index_label='Date')
+
+def load_pyramid(directory, symbol):
+    """Load a previously saved pyramid, or None if any level is missing"""
+    pyramid = {}
+    for level in LEVELS:
+        path = os.path.join(directory, f"{symbol}_{level}.csv")
+        if not os.path.exists(path):
+            return None
+        bars = pd.read_csv(path)
+        bars['Date'] = pd.to_datetime(bars['Date'], utc=True)
+        bars.set_index('Date', inplace=True)
+        pyramid[level] = bars[list(OHLCV_AGG)]
+    return pyramid
+
+def refresh_pyramid(daily, directory, symbol):
+    """Load the cached pyramid for a symbol, add new daily bars and save it
+
+    Falls back to a full rebuild when there is no cache or the cached daily
+    history does not overlap the freshly loaded data.
+    """
+    pyramid = load_pyramid(directory, symbol)
+    if pyramid is None or pyramid['daily'].empty or daily.empty or pyramid['daily'].index[-1] < daily.index[0]:
+        pyramid = build_pyramid(daily)
+    else:
+        pyramid = update_pyramid(pyramid, daily)
+    save_pyramid(pyramid, directory, symbol)
+    return pyramid
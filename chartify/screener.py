@@ -0,0 +1,191 @@
+import os
+import glob
+import time
+import warnings
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from numpy.lib.stride_tricks import sliding_window_view
+from universe_dataset import write_universe_file, attach_universe, COLUMNS
+from memory_budget import get_memory_budget_mb, report_peak_rss
+
+UNIVERSE_FILE = "stock_data/screener_universe.bin"
+
+NS_PER_DAY = 86400 * 10**9
+
+def build_matrix(index, times, values, dtype='f8'):
+    """Align packed per-symbol rows onto one symbols x days grid
+
+    Takes the index, times and values of an attached UniverseDataset.
+    Returns the symbol names, the trading days and a dict of 2-D float
+    arrays of the given dtype, one per OHLCV column, with NaN where a symbol
+    has no bar for a day.
+    """
+    symbols = list(index)
+    day_numbers = times // NS_PER_DAY
+    days = np.unique(day_numbers)
+
+    matrix = {col: np.full((len(symbols), len(days)), np.nan, dtype=dtype) for col in COLUMNS}
+    for row, symbol in enumerate(symbols):
+        offset, length = index[symbol]
+        cols = np.searchsorted(days, day_numbers[offset:offset + length])
+        for i, col in enumerate(COLUMNS):
+            matrix[col][row, cols] = values[offset:offset + length, i]
+
+    dates = pd.to_datetime(days * NS_PER_DAY, utc=True)
+    return symbols, dates, matrix
+
+def rolling_mean(x, window):
+    """Trailing rolling mean along the time axis
+
+    Like pandas rolling().mean() with its default min_periods, a window is
+    NaN unless all of its days have a value, so it is NaN for the first
+    window-1 days and around any day the symbol has no bar for.
+    """
+    out = np.full(x.shape, np.nan, dtype=x.dtype)
+    if x.shape[1] >= window:
+        out[:, window - 1:] = np.mean(sliding_window_view(x, window, axis=1), axis=2)
+    return out
+
+def rolling_std(x, window):
+    """Trailing rolling sample standard deviation, NaN unless the window is full
+
+    Equal to pandas rolling().std() on a symbol's own bars wherever the
+    symbol has a bar on every day of the window.
+    """
+    out = np.full(x.shape, np.nan, dtype=x.dtype)
+    if x.shape[1] >= window:
+        out[:, window - 1:] = np.std(sliding_window_view(x, window, axis=1), axis=2, ddof=1)
+    return out
+
+def bollinger_band_width(close, window=7, num_std=2):
+    """Bollinger Band width for every symbol, as in calculate_bollinger_band_width"""
+    return 2 * num_std * rolling_std(close, window)
+
+def last_column(x, back=0):
+    """Each row's value `back` days before the latest day, NaN if the history is shorter"""
+    if x.shape[1] <= back:
+        return np.full(x.shape[0], np.nan)
+    return x[:, -1 - back]
+
+def last_percentile(x, lookback):
+    """Percentile (0-100) of each row's latest value within its last lookback values"""
+    if x.shape[1] == 0:
+        return np.full(x.shape[0], np.nan)
+    history = x[:, -lookback:]
+    latest = history[:, -1:]
+    valid = ~np.isnan(history)
+    below = np.sum((history <= latest) & valid, axis=1)
+    counts = np.sum(valid, axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pct = 100.0 * below / counts
+    pct[np.isnan(latest[:, 0])] = np.nan
+    return pct
+
+def rolling_correlation(x, y, window):
+    """Correlation over the last window days between each row of x and the series y"""
+    xw = x[:, -window:]
+    yw = np.broadcast_to(y[-window:], xw.shape)
+    mask = ~(np.isnan(xw) | np.isnan(yw))
+    n = mask.sum(axis=1)
+
+    xw = np.where(mask, xw, 0.0)
+    yw = np.where(mask, yw, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mx = xw.sum(axis=1) / n
+        my = yw.sum(axis=1) / n
+        dx = np.where(mask, xw - mx[:, None], 0.0)
+        dy = np.where(mask, yw - my[:, None], 0.0)
+        corr = (dx * dy).sum(axis=1) / np.sqrt((dx * dx).sum(axis=1) * (dy * dy).sum(axis=1))
+    corr[n < 3] = np.nan
+    return corr
+
+def screen_universe(symbols, matrix, bb_period=7, squeeze_lookback=126,
+                    volume_window=20, return_window=20, corr_window=60):
+    """Compute cross-sectional screens for every symbol at once
+
+    Returns a DataFrame with one row per symbol, sorted tightest Bollinger
+    squeeze first.
+    """
+    close = matrix['Close']
+    volume = matrix['Volume']
+
+    with warnings.catch_warnings():
+        # Rows that are all NaN inside a window are expected for short histories
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+
+        bb_width = bollinger_band_width(close, window=bb_period)
+        squeeze_pct = last_percentile(bb_width, squeeze_lookback)
+
+        # Histories shorter than a window give NaN for that screen
+        avg_volume = last_column(rolling_mean(volume[:, :-1], volume_window))
+        volume_spike = last_column(volume) / avg_volume
+
+        returns = close[:, 1:] / close[:, :-1] - 1
+        window_return = last_column(close) / last_column(close, return_window) - 1
+        universe_return = np.nanmean(returns, axis=0)
+        correlation = rolling_correlation(returns, universe_return, corr_window)
+
+    results = pd.DataFrame({
+        'Symbol': [s.split('_')[0] for s in symbols],
+        'Chart': symbols,
+        'Close': last_column(close),
+        'BB_Width': last_column(bb_width),
+        'BB_Squeeze_Pct': squeeze_pct,
+        'Volume_Spike': volume_spike,
+        f'Return_{return_window}d_%': window_return * 100,
+        'Corr_To_Universe': correlation,
+    })
+    results['Return_Rank'] = results[f'Return_{return_window}d_%'].rank(ascending=False, method='min')
+    results['Volume_Spike_Rank'] = results['Volume_Spike'].rank(ascending=False, method='min')
+    results['Squeeze_Rank'] = results['BB_Squeeze_Pct'].rank(ascending=True, method='min')
+
+    return results.sort_values(['BB_Squeeze_Pct', 'BB_Width'], na_position='last').reset_index(drop=True)
+
+def main():
+    """Main function to screen all symbols in stock_data/"""
+    # Use the same BB period as the charts
+    try:
+        with open("days.txt", "r") as f:
+            lines = f.read().strip().split('\n')
+            bb_period = int(lines[1]) if len(lines) > 1 else 7
+    except (FileNotFoundError, ValueError, IndexError):
+        bb_period = 7
+
+    csv_files = [f for f in glob.glob("stock_data/*_history_*.csv") if not f.startswith("stock_data/archive")]
+    if not csv_files:
+        print("No history CSV files found in stock_data/ directory")
+        return
+
+    # Pack the histories into a memory-mapped file so only one CSV frame is
+    # parsed at a time and the packed rows are backed by disk, not RAM
+    print(f"Loading {len(csv_files)} CSV files...")
+    os.makedirs("stock_data", exist_ok=True)
+    write_universe_file(csv_files, UNIVERSE_FILE)
+    universe = attach_universe(path=UNIVERSE_FILE)
+
+    # In memory-bounded mode the symbols x days grid is kept as float32,
+    # which halves the largest arrays of the screen
+    dtype = 'f4' if get_memory_budget_mb() is not None else 'f8'
+    try:
+        start = time.perf_counter()
+        symbols, dates, matrix = build_matrix(universe.index, universe.times, universe.values, dtype=dtype)
+        results = screen_universe(symbols, matrix, bb_period=bb_period)
+        elapsed = time.perf_counter() - start
+    finally:
+        universe.close()
+        os.remove(UNIVERSE_FILE)
+    print(f"Screened {len(symbols)} symbols x {len(dates)} days in {elapsed:.3f}s")
+
+    print("\n" + "=" * 60)
+    print("TIGHTEST BOLLINGER SQUEEZES")
+    print("=" * 60)
+    print(results.head(20).to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+
+    filename = f"stock_data/screener_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    results.to_csv(filename, index=False)
+    print(f"\nScreener results saved to {filename}")
+    report_peak_rss("screener")
+
+if __name__ == "__main__":
+    main()
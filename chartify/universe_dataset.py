@@ -0,0 +1,173 @@
+import os
+import json
+import mmap
+import numpy as np
+import pandas as pd
+from multiprocessing import shared_memory
+from csv_candlestick_app import load_csv_data
+
+# Buffer layout (all sections 64-byte aligned):
+#   [8-byte capacity][8-byte header length]
+#   [times int64 x capacity][OHLCV float64 x capacity x 5][JSON header]
+# Capacity is an upper bound on the row count taken from the CSV line counts,
+# so each file can be parsed straight into its place in the buffer. The JSON
+# header maps each symbol to its (offset, length) row range and goes last,
+# once the real row counts are known.
+COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+ALIGN = 64
+
+def _aligned(size):
+    return (size + ALIGN - 1) // ALIGN * ALIGN
+
+def _chart_name(csv_file):
+    return os.path.basename(csv_file).rsplit('.', 1)[0]
+
+def _count_rows(csv_file):
+    """Upper bound on the data rows of a CSV file, without parsing it"""
+    count = 0
+    with open(csv_file, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            count += chunk.count(b'\n')
+    return count
+
+def _offsets(capacity):
+    """Return (times offset, values offset, header offset) for a buffer"""
+    times_offset = ALIGN
+    values_offset = _aligned(times_offset + capacity * 8)
+    return times_offset, values_offset, _aligned(values_offset + capacity * len(COLUMNS) * 8)
+
+def _plan(csv_files):
+    """Return (capacity, total buffer size) for packing csv_files"""
+    capacity = sum(_count_rows(csv_file) for csv_file in csv_files)
+
+    # Offsets and lengths never exceed the capacity, so a header with every
+    # span set to the capacity is the largest the real header can be
+    largest = {'rows': capacity, 'columns': COLUMNS,
+               'symbols': {_chart_name(f): [capacity, capacity] for f in csv_files}}
+    header_size = len(json.dumps(largest).encode('utf-8'))
+    return capacity, _offsets(capacity)[2] + header_size
+
+def _fill(buf, csv_files, capacity):
+    """Parse each CSV file directly into the buffer and write the header
+
+    Only one file's frame is held at a time. Returns the index mapping each
+    chart name to its (offset, length) rows.
+    """
+    times_offset, values_offset, header_offset = _offsets(capacity)
+    times = np.ndarray((capacity,), dtype='<i8', buffer=buf, offset=times_offset)
+    values = np.ndarray((capacity, len(COLUMNS)), dtype='<f8', buffer=buf, offset=values_offset)
+
+    index = {}
+    offset = 0
+    for csv_file in csv_files:
+        name = _chart_name(csv_file)
+        try:
+            df = load_csv_data(csv_file)
+        except Exception as e:
+            print(f"Skipping {csv_file}: {e}")
+            continue
+
+        length = len(df)
+        times[offset:offset + length] = df.index.values.astype('datetime64[ns]').view('i8')
+        values[offset:offset + length] = df[COLUMNS].to_numpy(dtype='f8')
+        index[name] = (offset, length)
+        offset += length
+
+    # Drop the views so the buffer can be closed by the caller
+    del times, values
+
+    header = json.dumps({'rows': offset, 'columns': COLUMNS, 'symbols': index}).encode('utf-8')
+    buf[:8] = capacity.to_bytes(8, 'little')
+    buf[8:16] = len(header).to_bytes(8, 'little')
+    buf[header_offset:header_offset + len(header)] = header
+    return index
+
+class UniverseDataset:
+    """Read-only view of a packed universe living in shared memory or an mmap file"""
+
+    def __init__(self, buf, handle=None):
+        self._buf = buf
+        self._handle = handle
+
+        capacity = int.from_bytes(bytes(buf[:8]), 'little')
+        header_len = int.from_bytes(bytes(buf[8:16]), 'little')
+        times_offset, values_offset, header_offset = _offsets(capacity)
+        header = json.loads(bytes(buf[header_offset:header_offset + header_len]).decode('utf-8'))
+        rows = header['rows']
+        self.index = {name: tuple(span) for name, span in header['symbols'].items()}
+
+        self.times = np.ndarray((rows,), dtype='<i8', buffer=buf, offset=times_offset)
+        self.values = np.ndarray((rows, len(COLUMNS)), dtype='<f8', buffer=buf, offset=values_offset)
+        self.times.flags.writeable = False
+        self.values.flags.writeable = False
+
+    @property
+    def symbols(self):
+        return list(self.index)
+
+    def arrays(self, symbol):
+        """Zero-copy (times, values) views for one symbol"""
+        offset, length = self.index[symbol]
+        return self.times[offset:offset + length], self.values[offset:offset + length]
+
+    def frame(self, symbol):
+        """OHLCV frame for one symbol, in the format returned by load_csv_data"""
+        times, values = self.arrays(symbol)
+        index = pd.DatetimeIndex(pd.to_datetime(times, utc=True), name='Date')
+        return pd.DataFrame(values, index=index, columns=COLUMNS, copy=False)
+
+    def close(self):
+        """Release the views and detach from the underlying buffer
+
+        Frames and arrays handed out by this dataset must be dropped first,
+        otherwise the buffer is still exported and cannot be closed.
+        """
+        self.times = self.values = None
+        if isinstance(self._handle, mmap.mmap):
+            self._buf.release()
+        self._buf = None
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+def create_shared_universe(csv_files, name=None):
+    """Pack CSV files into a new shared memory block
+
+    Returns (shm, index). The caller owns the SharedMemory object and must
+    close() and unlink() it when all workers are done.
+    """
+    capacity, size = _plan(csv_files)
+    shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+    try:
+        index = _fill(shm.buf, csv_files, capacity)
+    except BaseException:
+        shm.close()
+        shm.unlink()
+        raise
+    return shm, index
+
+def write_universe_file(csv_files, path):
+    """Pack CSV files into a file that can be memory-mapped by attach_universe
+
+    The file is written through a writable mapping, so the packed data is
+    paged out to disk instead of being held in memory.
+    """
+    capacity, size = _plan(csv_files)
+    with open(path, 'w+b') as f:
+        f.truncate(size)
+        with mmap.mmap(f.fileno(), size) as mm:
+            buf = memoryview(mm)
+            index = _fill(buf, csv_files, capacity)
+            buf.release()
+            mm.flush()
+    return index
+
+def attach_universe(name=None, path=None):
+    """Attach to a packed universe by shared memory name or mmap file path"""
+    if name is not None:
+        shm = shared_memory.SharedMemory(name=name)
+        return UniverseDataset(shm.buf, shm)
+
+    with open(path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return UniverseDataset(memoryview(mm), mm)
@@ -33,6 +33,13 @@ def copy_files_to_react():
         shutil.copy2(html_source, html_dest)
         print(f"[OK] Copied HTML file to {html_dest}")
         
+        # Copy the chart index the collage page loads at runtime
+        for index_name in ("stock_charts_index.json", "stock_charts_index.js"):
+            index_source = base_dir / index_name
+            if index_source.exists():
+                shutil.copy2(index_source, react_public_dir / index_name)
+                print(f"[OK] Copied chart index to {react_public_dir / index_name}")
+        
         # Copy images folder
         images_dest = react_public_dir / "stock_png"
         
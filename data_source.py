@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Pluggable price data sources.
+
+All fetching goes through get_data_source().history(symbol, period, interval),
+which mirrors yf.Ticker(symbol).history(...). The source is picked with
+environment variables so it carries through execute_all.py subprocesses:
+
+    STOCK_DATA_SOURCE        yfinance (default) or replay
+    STOCK_REPLAY_DATE        replay the archived run as of this date (YYYY-MM-DD)
+    STOCK_REPLAY_LATENCY     seconds to sleep per request (default 0)
+    STOCK_REPLAY_ERROR_RATE  fraction of requests that fail (default 0)
+    STOCK_REPLAY_SEED        seed for the injected errors
+"""
+
+import os
+import re
+import glob
+import time
+import random
+import threading
+import pandas as pd
+import yfinance as yf
+from functools import lru_cache
+
+REPLAY_DIRS = ["stock_data/archive", "stock_data", "chartify/stock_data"]
+
+HISTORY_FILE_PATTERN = re.compile(r'^(?P<symbol>.+)_2year_history_(?P<timestamp>\d{8}_\d{6})\.csv$')
+
+class YFinanceSource:
+    """Fetch live data from Yahoo Finance"""
+
+    name = "yfinance"
+
+    def history(self, symbol, period="2y", interval="1d"):
+        stock = yf.Ticker(symbol)
+        return stock.history(period=period, interval=interval)
+
+    def available_symbols(self):
+        """Symbols known to the source, or None if it can serve any symbol"""
+        return None
+
+class ReplayError(ConnectionError):
+    """Injected failure raised by ReplaySource"""
+
+class ReplaySource:
+    """Serve archived history CSVs as if they came from yfinance
+
+    For each symbol the newest archived run at or before run_date is used.
+    Every request sleeps for `latency` seconds and fails with probability
+    `error_rate`, so fetch throughput can be measured without network access.
+    """
+
+    name = "replay"
+
+    def __init__(self, run_date=None, data_dirs=REPLAY_DIRS, latency=0.0, error_rate=0.0, seed=None):
+        self.run_date = run_date
+        self.latency = latency
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._files = self._index_files(data_dirs, run_date)
+
+    @staticmethod
+    def _index_files(data_dirs, run_date):
+        """Map each symbol to its newest history CSV at or before run_date"""
+        cutoff = None
+        if run_date is not None:
+            cutoff = pd.Timestamp(run_date).strftime('%Y%m%d') + "_235959"
+
+        files = {}
+        for data_dir in data_dirs:
+            for path in glob.glob(os.path.join(data_dir, "*_2year_history_*.csv")):
+                match = HISTORY_FILE_PATTERN.match(os.path.basename(path))
+                if not match:
+                    continue
+                symbol, timestamp = match.group('symbol'), match.group('timestamp')
+                if cutoff is not None and timestamp > cutoff:
+                    continue
+                if symbol not in files or timestamp > files[symbol][0]:
+                    files[symbol] = (timestamp, path)
+        return {symbol: path for symbol, (_, path) in files.items()}
+
+    def _simulate_network(self, symbol):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            failed = self._random.random() < self.error_rate
+        if failed:
+            raise ReplayError(f"Injected replay error for {symbol}")
+
+    def history(self, symbol, period="2y", interval="1d"):
+        self._simulate_network(symbol)
+
+        # Only daily history is archived; yfinance returns an empty frame
+        # for symbols or intervals it has no data for
+        path = self._files.get(symbol)
+        if path is None or interval != "1d":
+            return pd.DataFrame(columns=['Open', 'High', 'Low', 'Close', 'Volume', 'Dividends', 'Stock Splits'])
+
+        data = pd.read_csv(path)
+        data['Date'] = pd.to_datetime(data['Date'], utc=True).dt.tz_convert('America/New_York')
+        data.set_index('Date', inplace=True)
+        return slice_period(data, period)
+
+    def available_symbols(self):
+        return sorted(self._files)
+
+def slice_period(data, period):
+    """Trim a daily frame to a yfinance period string such as 1d, 6mo, 2y, ytd or max"""
+    if data.empty or period in (None, "max"):
+        return data
+
+    last = data.index[-1]
+    if period == "ytd":
+        return data[data.index >= last.normalize().replace(month=1, day=1)]
+
+    match = re.match(r'^(\d+)(d|mo|y)$', period)
+    if not match:
+        raise ValueError(f"Unsupported period '{period}'")
+
+    count, unit = int(match.group(1)), match.group(2)
+    if unit == "d":
+        return data.tail(count)
+    offset = pd.DateOffset(months=count) if unit == "mo" else pd.DateOffset(years=count)
+    return data[data.index > last - offset]
+
+@lru_cache(maxsize=None)
+def get_data_source():
+    """Return the data source selected by the STOCK_DATA_SOURCE environment variable"""
+    kind = os.environ.get("STOCK_DATA_SOURCE", "yfinance").lower()
+
+    if kind == "yfinance":
+        return YFinanceSource()
+
+    if kind == "replay":
+        seed = os.environ.get("STOCK_REPLAY_SEED")
+        source = ReplaySource(
+            run_date=os.environ.get("STOCK_REPLAY_DATE") or None,
+            latency=float(os.environ.get("STOCK_REPLAY_LATENCY", "0")),
+            error_rate=float(os.environ.get("STOCK_REPLAY_ERROR_RATE", "0")),
+            seed=int(seed) if seed else None,
+        )
+        print(f"Using replay data source ({len(source.available_symbols())} symbols"
+              f"{', as of ' + source.run_date if source.run_date else ''})")
+        return source
+
+    raise ValueError(f"Unknown STOCK_DATA_SOURCE '{kind}' (expected 'yfinance' or 'replay')")
@@ -1,14 +1,13 @@
-import yfinance as yf
 import pandas as pd
 from datetime import datetime
 import os
 import time
+from data_source import get_data_source
 
 def get_stock_data(symbol, period="2y"):
     """Fetch stock data for a given symbol"""
     try:
-        stock = yf.Ticker(symbol)
-        data = stock.history(period=period)
+        data = get_data_source().history(symbol, period=period)
         return data
     except Exception as e:
         print(f"Error fetching data for {symbol}: {e}")
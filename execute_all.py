@@ -7,6 +7,7 @@ import subprocess
 import sys
 import os
 from datetime import datetime
+from chartify.memory_budget import get_memory_budget_mb, peak_rss_mb
 
 def run_script(script_path):
     """Execute a Python script as a separate process"""
@@ -16,7 +17,18 @@ def run_script(script_path):
     print(f"{'='*50}")
     
     try:
-        result = subprocess.run([sys.executable, script_path], check=True)
+        if hasattr(os, "wait4"):
+            # wait4 also returns the child's resource usage, so the peak RSS
+            # of each stage can be reported on its own
+            process = subprocess.Popen([sys.executable, script_path])
+            _, status, rusage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+            peak = peak_rss_mb(rusage)
+            print(f"[memory] {script_path}: peak RSS {peak:.1f} MB")
+            if process.returncode != 0:
+                raise subprocess.CalledProcessError(process.returncode, script_path)
+        else:
+            subprocess.run([sys.executable, script_path], check=True)
         print(f"SUCCESS: {script_path} completed successfully")
         return True
     except subprocess.CalledProcessError as e:
@@ -30,11 +42,16 @@ def main():
     print("Executing all scripts in sequence...")
     print(f"Start time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
+    budget_mb = get_memory_budget_mb()
+    if budget_mb is not None:
+        print(f"Memory-bounded mode: budget {budget_mb} MB per stage")
+    
     scripts = [
         "archive_files.py",
         "top_volume_stocks.py",
         "download_top_volume_history.py", 
         "chartify/csv_candlestick_app.py",
+        "chartify/screener.py",
         "chartify/generate_html_collage.py",
 	"copy_to_react.py"
     ]
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Intraday bar storage using fixed-width, append-only, memory-mapped files.
+Each symbol gets one binary file per trading day and interval:
+
+    intraday_data/<interval>/<SYMBOL>/<YYYYMMDD>.bin
+
+Every record has the same width (see BAR_DTYPE), so a file can be opened with
+numpy.memmap and sliced by time without parsing or copying.
+"""
+
+import os
+import glob
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from data_source import get_data_source
+from download_top_volume_history import read_top_volume_csv
+
+INTRADAY_DIR = "intraday_data"
+
+# Timestamps are UTC nanoseconds; records within a file are sorted by time
+BAR_DTYPE = np.dtype([
+    ('time', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<i8'),
+])
+
+# yfinance only serves a limited look-back for intraday intervals
+INTERVAL_PERIODS = {
+    '1m': '7d',
+    '5m': '60d',
+}
+
+def day_file(symbol, day, interval, base_dir=INTRADAY_DIR):
+    """Return the path of the binary file for one symbol, day and interval"""
+    return os.path.join(base_dir, interval, symbol, f"{day:%Y%m%d}.bin")
+
+def frame_to_records(data):
+    """Convert a yfinance-style OHLCV frame into a BAR_DTYPE array"""
+    index = data.index
+    if index.tz is None:
+        index = index.tz_localize('UTC')
+
+    records = np.empty(len(data), dtype=BAR_DTYPE)
+    records['time'] = index.tz_convert('UTC').values.astype('datetime64[ns]').view('i8')
+    records['open'] = data['Open'].to_numpy(dtype='f8')
+    records['high'] = data['High'].to_numpy(dtype='f8')
+    records['low'] = data['Low'].to_numpy(dtype='f8')
+    records['close'] = data['Close'].to_numpy(dtype='f8')
+    records['volume'] = data['Volume'].to_numpy(dtype='i8')
+    return records
+
+def last_stored_time(path):
+    """Return the timestamp of the last record in a day file, or None"""
+    if not os.path.exists(path):
+        return None
+    size = os.path.getsize(path)
+    if size < BAR_DTYPE.itemsize:
+        return None
+    with open(path, 'rb') as f:
+        f.seek(size - BAR_DTYPE.itemsize)
+        record = np.frombuffer(f.read(BAR_DTYPE.itemsize), dtype=BAR_DTYPE)
+    return int(record['time'][0])
+
+def append_bars(symbol, data, interval, base_dir=INTRADAY_DIR):
+    """Append new bars to the per-day files of a symbol
+
+    Bars are grouped by exchange-local trading day. Only bars at or after the
+    last stored record of each day are written, so re-running a download is
+    idempotent; a fetched bar with the same timestamp as the last stored one
+    overwrites it, which completes a bar that was stored while still forming.
+    Returns the number of records written.
+    """
+    if data is None or data.empty:
+        return 0
+
+    # yfinance intraday frames can contain bars with missing prices or
+    # volume; they cannot be stored in the fixed-width integer records
+    data = data.dropna(subset=['Open', 'High', 'Low', 'Close', 'Volume']).sort_index()
+    if data.empty:
+        return 0
+
+    local_days = data.index.date if data.index.tz is not None else data.index.normalize().date
+    appended = 0
+
+    for day in sorted(set(local_days)):
+        records = frame_to_records(data[local_days == day])
+        path = day_file(symbol, day, interval, base_dir)
+
+        # Drop a partially written trailing record left by an interrupted run
+        if os.path.exists(path) and os.path.getsize(path) % BAR_DTYPE.itemsize:
+            with open(path, 'r+b') as f:
+                f.truncate(os.path.getsize(path) // BAR_DTYPE.itemsize * BAR_DTYPE.itemsize)
+
+        last_time = last_stored_time(path)
+        if last_time is not None:
+            records = records[records['time'] >= last_time]
+        if len(records) == 0:
+            continue
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'ab') as f:
+            # The stored last bar may have been fetched while it was still
+            # forming; replace it with the fetched version of the same bar
+            if last_time is not None and records['time'][0] == last_time:
+                f.truncate(f.tell() - BAR_DTYPE.itemsize)
+            f.write(records.tobytes())
+        appended += len(records)
+
+    return appended
+
+def open_day(symbol, day, interval, base_dir=INTRADAY_DIR):
+    """Memory-map one day of bars read-only (None if nothing is stored)"""
+    path = day_file(symbol, day, interval, base_dir)
+    if not os.path.exists(path):
+        return None
+    count = os.path.getsize(path) // BAR_DTYPE.itemsize
+    if count == 0:
+        return None
+    return np.memmap(path, dtype=BAR_DTYPE, mode='r', shape=(count,))
+
+def slice_by_time(bars, start=None, end=None):
+    """Zero-copy slice of a sorted bar array to the half-open range [start, end)"""
+    times = bars['time']
+    lo = 0 if start is None else np.searchsorted(times, pd.Timestamp(start).value, side='left')
+    hi = len(bars) if end is None else np.searchsorted(times, pd.Timestamp(end).value, side='left')
+    return bars[lo:hi]
+
+def stored_days(symbol, interval, base_dir=INTRADAY_DIR):
+    """List the trading days stored for a symbol, oldest first"""
+    paths = glob.glob(os.path.join(base_dir, interval, symbol, "*.bin"))
+    return sorted(datetime.strptime(os.path.basename(p)[:8], '%Y%m%d').date() for p in paths)
+
+def iter_bars(symbol, interval, start=None, end=None, base_dir=INTRADAY_DIR):
+    """Yield (day, bars) for each stored day overlapping [start, end)
+
+    Each day is memory-mapped on demand and the slice is a view into the
+    file, so memory use is bounded by one day regardless of history length.
+    """
+    start_day = pd.Timestamp(start).date() if start is not None else None
+    end_day = pd.Timestamp(end).date() if end is not None else None
+
+    for day in stored_days(symbol, interval, base_dir):
+        if start_day is not None and day < start_day:
+            continue
+        if end_day is not None and day > end_day:
+            break
+        bars = open_day(symbol, day, interval, base_dir)
+        if bars is None:
+            continue
+        bars = slice_by_time(bars, start, end)
+        if len(bars):
+            yield day, bars
+
+def bars_to_frame(bars):
+    """Convert bar records into the OHLCV frame returned by load_csv_data"""
+    index = pd.DatetimeIndex(pd.to_datetime(np.asarray(bars['time']), utc=True), name='Date')
+    return pd.DataFrame({
+        'Open': bars['open'],
+        'High': bars['high'],
+        'Low': bars['low'],
+        'Close': bars['close'],
+        'Volume': bars['volume'],
+    }, index=index)
+
+def load_intraday_data(symbol, interval, start=None, end=None, base_dir=INTRADAY_DIR):
+    """Load intraday bars for a time range as a load_csv_data-style frame"""
+    frames = [bars_to_frame(bars) for _, bars in iter_bars(symbol, interval, start, end, base_dir)]
+    if not frames:
+        return bars_to_frame(np.empty(0, dtype=BAR_DTYPE))
+    return pd.concat(frames)
+
+def get_intraday_data(symbol, interval):
+    """Fetch the longest available intraday history for a symbol"""
+    try:
+        data = get_data_source().history(symbol, period=INTERVAL_PERIODS[interval], interval=interval)
+        return data
+    except Exception as e:
+        print(f"Error fetching {interval} data for {symbol}: {e}")
+        return None
+
+def download_intraday_for_tickers(tickers, intervals=('1m', '5m'), base_dir=INTRADAY_DIR):
+    """Download and append intraday bars for a list of tickers"""
+    total = 0
+    for i, symbol in enumerate(tickers, 1):
+        for interval in intervals:
+            data = get_intraday_data(symbol, interval)
+            try:
+                count = append_bars(symbol, data, interval, base_dir)
+            except Exception as e:
+                print(f"[{i}/{len(tickers)}] {symbol} {interval}: Error storing bars - {e}")
+                continue
+            total += count
+            print(f"[{i}/{len(tickers)}] {symbol} {interval}: {count} bars written")
+    print(f"\nWrote {total} intraday bars to {base_dir}/")
+
+def main():
+    print("INTRADAY BAR DOWNLOADER")
+    print("=" * 60)
+
+    tickers = read_top_volume_csv()
+    if not tickers:
+        print("Could not load ticker symbols. Exiting.")
+        return
+
+    download_intraday_for_tickers(tickers)
+
+if __name__ == "__main__":
+    main()
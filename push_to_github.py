@@ -2,12 +2,46 @@
 """
 Git Push Automation Script
 Automates the process of adding, committing, and pushing changes to GitHub
+
+Run with --publish to keep generated artifacts (CSVs, PNGs, HTML) out of the
+main branch: they are stored on a separate, force-updated branch with pruned
+history and only a manifest of their content hashes is committed with the code.
+Optional --remote NAME and --branch NAME override origin/main.
+
+The site files in stock-app/public stay on main, since Vercel builds the app
+from main. Once artifacts_manifest.json exists, running without --publish
+publishes too, so a plain 'git add .' cannot put the artifacts back on main.
 """
 
+import os
+import json
+import hashlib
 import subprocess
 import sys
 from datetime import datetime
 
+# Generated files that publish mode keeps off the main branch. The copies in
+# stock-app/public are left out: Vercel deploys the site from main, so the
+# current charts, collage and index must stay tracked there.
+ARTIFACT_PATHS = [
+    "stock_data",
+    "stock_png",
+    "chartify/stock_data",
+    "chartify/stock_png",
+    "archive",
+    "stock_charts_collage.html",
+    "stock_charts_index.json",
+    "stock_charts_index.js",
+]
+
+ARTIFACT_MANIFEST = "artifacts_manifest.json"
+ARTIFACTS_BRANCH = "artifacts"
+
+# Commits kept on the artifacts branch before it is restarted as a new
+# orphan commit. Building on the previous commit lets push send only new
+# blobs; restarting now and then lets old artifacts be garbage collected.
+ARTIFACTS_HISTORY = 20
+
 def run_command(command, description=""):
     """Run a shell command and return the result"""
     try:
@@ -29,10 +63,208 @@ def check_git_status():
     except subprocess.CalledProcessError:
         return False
 
+def git(args, repo_dir=".", input=None):
+    """Run a git command in repo_dir and return its stdout"""
+    result = subprocess.run(["git"] + args, cwd=repo_dir, input=input,
+                            capture_output=True, text=True, check=True)
+    return result.stdout
+
+def git_blob_hash(path):
+    """Compute the git blob id of a file without writing it to the object store"""
+    digest = hashlib.sha1(f"blob {os.path.getsize(path)}\0".encode())
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def collect_artifacts(repo_dir="."):
+    """List tracked and untracked (but not ignored) artifact files"""
+    output = git(["ls-files", "-z", "--cached", "--others", "--exclude-standard", "--"] + ARTIFACT_PATHS, repo_dir)
+    paths = sorted(set(p for p in output.split("\0") if p))
+    return [p for p in paths if os.path.isfile(os.path.join(repo_dir, p))]
+
+def load_manifest(repo_dir="."):
+    """Load the artifact manifest committed by the previous publish"""
+    path = os.path.join(repo_dir, ARTIFACT_MANIFEST)
+    if not os.path.exists(path):
+        return {"artifacts": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def write_manifest(manifest, repo_dir="."):
+    """Write the manifest with one artifact per line so diffs stay small"""
+    artifacts = manifest["artifacts"]
+    lines = [f"    {json.dumps(path)}: {json.dumps(artifacts[path])}" for path in sorted(artifacts)]
+    with open(os.path.join(repo_dir, ARTIFACT_MANIFEST), "w", encoding="utf-8") as f:
+        f.write("{\n")
+        f.write(f'  "branch": {json.dumps(manifest["branch"])},\n')
+        f.write(f'  "commit": {json.dumps(manifest["commit"])},\n')
+        f.write('  "artifacts": {\n' + ",\n".join(lines) + "\n  }\n}\n")
+
+def build_tree(entries, repo_dir="."):
+    """Create nested git trees for {path: blob id} and return the root tree id"""
+    files, dirs = {}, {}
+    for path, blob in entries.items():
+        head, _, rest = path.partition("/")
+        if rest:
+            dirs.setdefault(head, {})[rest] = blob
+        else:
+            files[head] = blob
+
+    lines = [f"100644 blob {blob}\t{name}" for name, blob in files.items()]
+    lines += [f"040000 tree {build_tree(sub, repo_dir)}\t{name}" for name, sub in dirs.items()]
+    return git(["mktree"], repo_dir, input="\n".join(lines) + "\n").strip()
+
+def pack_size(ref, remote_ref, repo_dir="."):
+    """Bytes git would send to move remote_ref to ref (a thin pack, like push)"""
+    revs = ref + "\n"
+    if resolve_ref(remote_ref, repo_dir):
+        revs += f"^{remote_ref}\n"
+
+    process = subprocess.Popen(["git", "pack-objects", "--stdout", "--revs", "--thin", "-q"],
+                               cwd=repo_dir, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    process.stdin.write(revs.encode())
+    process.stdin.close()
+    size = 0
+    for block in iter(lambda: process.stdout.read(1024 * 1024), b""):
+        size += len(block)
+    process.wait()
+    return size
+
+def resolve_ref(ref, repo_dir="."):
+    """Return the commit id of a ref, or None if it does not exist"""
+    result = subprocess.run(["git", "rev-parse", "--verify", "-q", ref], cwd=repo_dir,
+                            capture_output=True, text=True)
+    return result.stdout.strip() if result.returncode == 0 else None
+
+def publish_artifacts(repo_dir=".", branch=ARTIFACTS_BRANCH, base=None, max_history=ARTIFACTS_HISTORY):
+    """Store artifacts on their own branch, writing only blobs whose hash changed
+
+    Returns (manifest, changed paths, bytes written to the object store).
+    The new commit builds on `base` (the previous artifacts commit) so a push
+    only transfers changed blobs. Once the branch holds max_history commits
+    it is restarted as a parentless commit, which drops old artifacts from
+    its history instead of letting them pile up.
+    """
+    previous = load_manifest(repo_dir)["artifacts"]
+    artifacts = {}
+    changed = []
+    for path in collect_artifacts(repo_dir):
+        full_path = os.path.join(repo_dir, path)
+        artifacts[path] = {"blob": git_blob_hash(full_path), "size": os.path.getsize(full_path)}
+        if previous.get(path, {}).get("blob") != artifacts[path]["blob"]:
+            changed.append(path)
+
+    # Unchanged blobs may still be missing locally (e.g. in a fresh clone)
+    blobs = "\n".join(a["blob"] for a in artifacts.values()) + "\n"
+    missing = [line.split()[0] for line in git(["cat-file", "--batch-check"], repo_dir, input=blobs).splitlines()
+               if line.endswith(" missing")]
+    to_write = sorted(set(changed) | {p for p, a in artifacts.items() if a["blob"] in missing})
+
+    staged_bytes = 0
+    if to_write:
+        # --no-filters stores the raw bytes, matching git_blob_hash even when
+        # autocrlf or .gitattributes filters would rewrite the content
+        git(["hash-object", "-w", "--no-filters", "--stdin-paths"], repo_dir, input="\n".join(to_write) + "\n")
+        staged_bytes = sum(artifacts[p]["size"] for p in to_write)
+
+    removed = sorted(set(previous) - set(artifacts))
+    if base is None:
+        base = resolve_ref(f"refs/heads/{branch}", repo_dir)
+    manifest = {"branch": branch, "commit": base, "artifacts": artifacts}
+    if not changed and not removed and base:
+        git(["update-ref", f"refs/heads/{branch}", base], repo_dir)
+        return manifest, [], 0
+
+    commit_args = ["commit-tree", build_tree({path: a["blob"] for path, a in artifacts.items()}, repo_dir)]
+    if base and int(git(["rev-list", "--count", base], repo_dir)) < max_history:
+        commit_args += ["-p", base]
+    else:
+        print("Starting a new artifacts history")
+    commit_args += ["-m", f"Artifacts - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"]
+
+    manifest["commit"] = git(commit_args, repo_dir).strip()
+    git(["update-ref", f"refs/heads/{branch}", manifest["commit"]], repo_dir)
+    return manifest, changed + removed, staged_bytes
+
+def publish(repo_dir=".", remote="origin", branch="main", artifacts_branch=ARTIFACTS_BRANCH, message=None):
+    """Commit code plus the artifact manifest, and push artifacts to their own branch"""
+    print("=== Publishing code and artifacts ===")
+
+    # Build on what the remote already has so only new blobs are pushed
+    base = (resolve_ref(f"refs/remotes/{remote}/{artifacts_branch}", repo_dir)
+            or resolve_ref(f"refs/heads/{artifacts_branch}", repo_dir))
+    manifest, changed, artifact_bytes = publish_artifacts(repo_dir, artifacts_branch, base)
+    write_manifest(manifest, repo_dir)
+    print(f"Artifacts: {len(manifest['artifacts'])} tracked, {len(changed)} changed")
+
+    # Stop tracking artifacts on the main branch and stage everything else
+    git(["rm", "-r", "--cached", "--ignore-unmatch", "-q", "--"] + ARTIFACT_PATHS, repo_dir)
+    git(["add", "-A", "--", "."] + [f":(exclude){path}" for path in ARTIFACT_PATHS], repo_dir)
+
+    staged = [p for p in git(["diff", "--cached", "--name-only", "--diff-filter=AM"], repo_dir).splitlines() if p]
+    code_bytes = sum(os.path.getsize(os.path.join(repo_dir, p)) for p in staged)
+
+    has_commit = bool(git(["diff", "--cached", "--name-only"], repo_dir).strip())
+    if has_commit:
+        if not message:
+            message = f"Updated repository - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        git(["commit", "-q", "-m", message], repo_dir)
+
+    current = git(["rev-parse", "--abbrev-ref", "HEAD"], repo_dir).strip()
+    pushed_bytes = pack_size(f"refs/heads/{current}", f"refs/remotes/{remote}/{branch}", repo_dir)
+    pushed_bytes += pack_size(f"refs/heads/{artifacts_branch}", f"refs/remotes/{remote}/{artifacts_branch}", repo_dir)
+
+    # Push artifacts first: main's manifest must never point at an
+    # artifacts commit the remote does not have
+    git(["push", "-q", "--force", remote, f"refs/heads/{artifacts_branch}:refs/heads/{artifacts_branch}"], repo_dir)
+    git(["push", "-q", remote, f"HEAD:refs/heads/{branch}"], repo_dir)
+    # Keep the remote-tracking refs current so the next size estimate is accurate
+    git(["fetch", "-q", remote, f"+refs/heads/{branch}:refs/remotes/{remote}/{branch}",
+         f"+refs/heads/{artifacts_branch}:refs/remotes/{remote}/{artifacts_branch}"], repo_dir)
+
+    print(f"Bytes staged: {code_bytes + artifact_bytes:,} "
+          f"({code_bytes:,} code/manifest, {artifact_bytes:,} artifacts)")
+    print(f"Bytes pushed: {pushed_bytes:,}")
+    print(f"\n✅ Published {'a new commit' if has_commit else 'no code changes'} to {remote}/{branch} "
+          f"and artifacts to {remote}/{artifacts_branch}")
+    return {"staged_bytes": code_bytes + artifact_bytes, "pushed_bytes": pushed_bytes,
+            "changed_artifacts": changed}
+
+def option_value(args, name, default):
+    """Return the value given after a --name flag, or default if the flag is absent"""
+    if name not in args:
+        return default
+    position = args.index(name) + 1
+    if position >= len(args) or args[position].startswith("--"):
+        print(f"Error: {name} needs a value")
+        print("Usage: push_to_github.py [--publish] [--remote NAME] [--branch NAME]")
+        sys.exit(2)
+    return args[position]
+
 def main():
     """Main function to handle git push process"""
     print("=== Git Push Automation Script ===")
     
+    args = sys.argv[1:]
+    remote = option_value(args, "--remote", "origin")
+    branch = option_value(args, "--branch", "main")
+    
+    # After the first publish the artifacts are untracked on main; staging
+    # everything with 'git add .' would commit them right back
+    if "--publish" not in args and os.path.exists(ARTIFACT_MANIFEST):
+        print(f"Found {ARTIFACT_MANIFEST}, publishing artifacts to the '{ARTIFACTS_BRANCH}' branch")
+        args.append("--publish")
+    
+    if "--publish" in args:
+        try:
+            publish(remote=remote, branch=branch)
+        except subprocess.CalledProcessError as e:
+            print(f"Error running command: {' '.join(e.cmd)}")
+            print(f"Error output: {e.stderr}")
+            sys.exit(1)
+        return
+    
     # Check if there are changes to commit
     if not check_git_status():
         print("No changes to commit. Repository is up to date.")
@@ -1,8 +1,9 @@
-import yfinance as yf
 import pandas as pd
 import requests
 import os
 from datetime import datetime
+from data_source import get_data_source
+from chartify.memory_budget import get_memory_budget_mb, chunk_size_for_budget, downcast_frame, report_peak_rss
 
 def get_sp500_symbols():
     """Get S&P 500 stock symbols from Wikipedia"""
@@ -23,6 +24,29 @@ def get_sp500_symbols():
             'SBUX', 'MDT', 'UPS', 'NEE', 'LOW', 'IBM', 'AMGN', 'T', 'CVS', 'ORCL'
         ]
 
+def fetch_symbol_volume(symbol):
+    """Fetch the latest daily bar for one symbol as a volume record (None if unavailable)"""
+    try:
+        hist = get_data_source().history(symbol, period="1d")
+        
+        if not hist.empty:
+            latest_data = hist.iloc[-1]
+            print(f"  {symbol}: {latest_data['Volume']:,.0f} volume")
+            return {
+                'Symbol': symbol,
+                'Volume': latest_data['Volume'],
+                'Close': latest_data['Close'],
+                'Change_%': ((latest_data['Close'] - latest_data['Open']) / latest_data['Open'] * 100),
+                'Market_Cap_Est': latest_data['Close'] * latest_data['Volume']  # Rough estimate
+            }
+        else:
+            print(f"  {symbol}: No data available")
+            
+    except Exception as e:
+        print(f"  {symbol}: Error - {e}")
+    
+    return None
+
 def fetch_volume_data(symbols, batch_size=20):
     """Fetch volume data for a list of symbols in batches"""
     volume_data = []
@@ -34,51 +58,83 @@ def fetch_volume_data(symbols, batch_size=20):
         print(f"Processing batch {i//batch_size + 1}/{(len(symbols)-1)//batch_size + 1}: {len(batch)} stocks")
         
         for symbol in batch:
-            try:
-                ticker = yf.Ticker(symbol)
-                hist = ticker.history(period="1d")
-                
-                if not hist.empty:
-                    latest_data = hist.iloc[-1]
-                    volume_data.append({
-                        'Symbol': symbol,
-                        'Volume': latest_data['Volume'],
-                        'Close': latest_data['Close'],
-                        'Change_%': ((latest_data['Close'] - latest_data['Open']) / latest_data['Open'] * 100),
-                        'Market_Cap_Est': latest_data['Close'] * latest_data['Volume']  # Rough estimate
-                    })
-                    print(f"  {symbol}: {latest_data['Volume']:,.0f} volume")
-                else:
-                    print(f"  {symbol}: No data available")
-                    
-            except Exception as e:
-                print(f"  {symbol}: Error - {e}")
-                continue
+            record = fetch_symbol_volume(symbol)
+            if record is not None:
+                volume_data.append(record)
     
     return volume_data
 
+def fetch_top_volume_chunked(symbols, top_n=100, chunk_size=500, budget_mb=None):
+    """Fetch volume data in chunks, keeping only the running top N between them
+    
+    Only one chunk of records and the running top N are held in memory, so
+    memory use does not grow with the number of symbols. The first chunk has
+    chunk_size symbols; later chunks are sized to the budget from the measured
+    footprint of the previous chunk's records. Returns the top N DataFrame
+    sorted by volume and the number of symbols with data.
+    """
+    top = None
+    total = 0
+    start = 0
+    chunk_index = 0
+    
+    print(f"Fetching volume data for {len(symbols)} stocks in chunks...")
+    
+    while start < len(symbols):
+        chunk = symbols[start:start+chunk_size]
+        start += len(chunk)
+        chunk_index += 1
+        print(f"Processing chunk {chunk_index}: {len(chunk)} stocks ({start}/{len(symbols)})")
+        
+        records = [r for r in (fetch_symbol_volume(symbol) for symbol in chunk) if r is not None]
+        if records:
+            chunk_df = downcast_frame(pd.DataFrame(records))
+            total += len(chunk_df)
+            bytes_per_record = chunk_df.memory_usage(deep=True).sum() / len(chunk_df)
+            chunk_size = chunk_size_for_budget(bytes_per_record, default=chunk_size, budget_mb=budget_mb)
+            
+            top = chunk_df if top is None else pd.concat([top, chunk_df], ignore_index=True)
+            top = top.nlargest(top_n, 'Volume')
+        del records
+        report_peak_rss(f"volume chunk {chunk_index}")
+    
+    if top is None:
+        return pd.DataFrame(), 0
+    return top.reset_index(drop=True), total
+
 def main():
     print("=" * 60)
     print("TOP 100 VOLUME STOCKS TRACKER")
     print("=" * 60)
     
-    # Get stock symbols
-    symbols = get_sp500_symbols()
+    # Get stock symbols (an offline source only knows its archived symbols)
+    symbols = get_data_source().available_symbols() or get_sp500_symbols()
     print(f"Found {len(symbols)} symbols to analyze")
     
-    # Fetch volume data
-    volume_data = fetch_volume_data(symbols)
-    
-    if not volume_data:
-        print("No volume data collected!")
-        return
-    
-    # Create DataFrame and sort by volume
-    df = pd.DataFrame(volume_data)
-    df_sorted = df.sort_values('Volume', ascending=False)
-    
-    # Get top 100 (or however many we have)
-    top_100 = df_sorted.head(100)
+    budget_mb = get_memory_budget_mb()
+    if budget_mb is not None:
+        # Memory-bounded mode: merge chunk by chunk into the running top 100
+        # instead of collecting every record
+        top_100, total_analyzed = fetch_top_volume_chunked(symbols, top_n=100, budget_mb=budget_mb)
+        
+        if top_100.empty:
+            print("No volume data collected!")
+            return
+    else:
+        # Fetch volume data
+        volume_data = fetch_volume_data(symbols)
+        
+        if not volume_data:
+            print("No volume data collected!")
+            return
+        
+        # Create DataFrame and sort by volume
+        df = pd.DataFrame(volume_data)
+        df_sorted = df.sort_values('Volume', ascending=False)
+        
+        # Get top 100 (or however many we have)
+        top_100 = df_sorted.head(100)
+        total_analyzed = len(volume_data)
     
     print("\n" + "=" * 60)
     print(f"TOP {len(top_100)} STOCKS BY VOLUME")
@@ -102,10 +158,11 @@ def main():
     print("\n" + "=" * 60)
     print("SUMMARY STATISTICS")
     print("=" * 60)
-    print(f"Total stocks analyzed: {len(volume_data)}")
+    print(f"Total stocks analyzed: {total_analyzed}")
     print(f"Average volume (top 100): {top_100['Volume'].mean():,.0f}")
     print(f"Highest volume: {top_100['Volume'].iloc[0]:,.0f} ({top_100['Symbol'].iloc[0]})")
     print(f"Median volume (top 100): {top_100['Volume'].median():,.0f}")
+    report_peak_rss("top_volume_stocks")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file